@@ -0,0 +1,23 @@
+"""
+Ahead-of-time build of the Numba kernels
+
+Produces portfolio_kernels.*.so next to this file; streamlit_app.py imports it
+when present and falls back to the JIT versions in kernels.py otherwise.
+
+Usage: python build_ext.py
+"""
+
+import os
+
+from numba.pycc import CC
+
+from kernels import METRICS_KERNEL_SIG, ROLLING_MAX_SIG, metrics_kernel, rolling_max_deque
+
+cc = CC('portfolio_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+cc.export('metrics_kernel', METRICS_KERNEL_SIG)(metrics_kernel.py_func)
+cc.export('rolling_max_deque', ROLLING_MAX_SIG)(rolling_max_deque.py_func)
+
+if __name__ == "__main__":
+    cc.compile()
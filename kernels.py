@@ -0,0 +1,99 @@
+"""
+Numba kernels for the portfolio analytics engine
+
+Kept free of Streamlit imports so build_ext.py can compile them ahead of time
+"""
+
+import numpy as np
+from numba import njit, prange
+
+# Explicit signatures shared by the JIT decorators and the AOT build
+METRICS_KERNEL_SIG = "Tuple((f8[::1], f8[::1], f8[::1], f8, f8, f8))(f8[:, ::1], f8[::1])"
+ROLLING_MAX_SIG = "f8[::1](f8[::1], i8)"
+
+# Reordering-only fast-math: keeps NaN/inf semantics (no 'nnan'/'ninf') so bad
+# inputs propagate instead of being undefined
+FASTMATH_FLAGS = {'reassoc', 'contract', 'arcp'}
+
+@njit(METRICS_KERNEL_SIG, cache=True, fastmath=FASTMATH_FLAGS)
+def metrics_kernel(R, w):
+    """Single pass over the returns matrix: portfolio returns, Welford
+    mean/variance, cumulative growth and drawdown"""
+    n_days, n_assets = R.shape
+    pr = np.empty(n_days)
+    cum = np.empty(n_days)
+    dd = np.empty(n_days)
+    
+    mean = 0.0
+    m2 = 0.0
+    growth = 1.0
+    peak = 0.0
+    min_dd = 0.0
+    
+    for t in range(n_days):
+        r = 0.0
+        for i in range(n_assets):
+            r += R[t, i] * w[i]
+        pr[t] = r
+        
+        delta = r - mean
+        mean += delta / (t + 1)
+        m2 += delta * (r - mean)
+        
+        growth *= 1.0 + r
+        cum[t] = growth
+        if t == 0 or growth > peak:
+            peak = growth
+        dd[t] = growth / peak - 1.0
+        if dd[t] < min_dd:
+            min_dd = dd[t]
+    
+    variance = m2 / (n_days - 1) if n_days > 1 else np.nan
+    return pr, cum, dd, mean, variance, min_dd
+
+@njit(ROLLING_MAX_SIG, cache=True)
+def rolling_max_deque(x, window):
+    """Trailing `window`-day maximum via a monotonic index deque, O(n)"""
+    # Indexing is unchecked, so a non-positive window would read out of bounds
+    if window < 1:
+        raise ValueError("window must be >= 1")
+    n = x.shape[0]
+    out = np.empty(n)
+    dq = np.empty(n, np.int64)
+    head = 0
+    tail = 0
+    
+    for t in range(n):
+        # Drop indices whose values can no longer be the window maximum
+        while tail > head and x[dq[tail - 1]] <= x[t]:
+            tail -= 1
+        dq[tail] = t
+        tail += 1
+        # Expire the front once it falls out of the window
+        if dq[head] <= t - window:
+            head += 1
+        out[t] = x[dq[head]]
+    
+    return out
+
+@njit(parallel=True, cache=True, fastmath=FASTMATH_FLAGS)
+def metrics_batch(R, W, lookback):
+    """Run the fused kernel for each row of the (K, N) weight matrix in
+    parallel; returns a (K, 6) array of per-portfolio statistics"""
+    n_days = R.shape[0]
+    k = min(max(1, int(0.05 * n_days)), n_days - 1)
+    out = np.empty((W.shape[0], 6))
+    
+    for j in prange(W.shape[0]):
+        pr, cum, dd, mean, variance, min_dd = metrics_kernel(R, W[j])
+        if lookback > 0:
+            min_dd = (cum / rolling_max_deque(cum, lookback) - 1.0).min()
+        part = np.partition(pr, k)
+        out[j, 0] = cum[-1] - 1.0
+        out[j, 1] = mean
+        out[j, 2] = variance
+        out[j, 3] = part[k]
+        out[j, 4] = part[:k].mean() if k > 0 else part[k]
+        out[j, 5] = min_dd
+    
+    return out
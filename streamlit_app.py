@@ -11,11 +11,32 @@ import pandas as pd
 import numpy as np
 import yfinance as yf
 import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime, timedelta
+from pathlib import Path
+import functools
+import hashlib
+import importlib.util
+import os
+import tempfile
 import warnings
 warnings.filterwarnings('ignore')
 
+def _aot_kernels_current():
+    """True when a build_ext.py build exists and is newer than kernels.py"""
+    aot_spec = importlib.util.find_spec('portfolio_kernels')
+    if aot_spec is None or aot_spec.origin is None:
+        return False
+    source_spec = importlib.util.find_spec('kernels')
+    return os.path.getmtime(aot_spec.origin) >= os.path.getmtime(source_spec.origin)
+
+# The ahead-of-time build skips the JIT pause on the first analysis; a build
+# older than kernels.py may not match its source, so fall back to the JIT then.
+# Neither variant type-checks beyond this: callers pass contiguous float64 arrays.
+if _aot_kernels_current():
+    from portfolio_kernels import metrics_kernel, rolling_max_deque
+else:
+    from kernels import metrics_kernel, rolling_max_deque
+
 # Page configuration
 st.set_page_config(
     page_title="Portfolio Risk Analytics",
@@ -45,25 +66,136 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# On-disk price cache that survives server restarts and redeploys
+CACHE_DIR = Path.home() / ".cache" / "portfolio_risk"
+
+def _missing_tickers(data, tickers):
+    """Tickers with no price at all in the frame"""
+    available = data.reindex(columns=list(tickers)).notna().any()
+    return [ticker for ticker in tickers if not available[ticker]]
+
+def _yf_fetch(tickers, start, end):
+    """Download adjusted close prices from Yahoo Finance"""
+    data = yf.download(
+        list(tickers),
+        start=start,
+        end=end,
+        auto_adjust=False,
+        progress=False,
+        threads=True,
+        group_by='column'
+    )['Adj Close']
+    if len(tickers) == 1:
+        data = data.to_frame(name=tickers[0])
+    
+    # yfinance reports failed tickers as all-NaN columns; raise so neither
+    # cache layer keeps an unusable frame
+    missing = _missing_tickers(data, tickers)
+    if missing:
+        raise ValueError(f"No price data returned for {', '.join(missing)}")
+    return data
+
+@functools.lru_cache(maxsize=64)
+def _cached_prices(tickers, start, end):
+    """Price data memoized in-process and persisted as Parquet across sessions"""
+    key = hashlib.sha256(f"{sorted(tickers)}|{start}|{end}".encode()).hexdigest()
+    path = CACHE_DIR / f"{key}.parquet"
+    if path.exists():
+        try:
+            data = pd.read_parquet(path)
+            if not _missing_tickers(data, tickers):
+                return data
+        except Exception:
+            pass
+        # Corrupt or incomplete entry: discard it and download again
+        path.unlink(missing_ok=True)
+    
+    data = _yf_fetch(tickers, start, end)
+    # Only persist frames where every requested ticker has prices
+    if not _missing_tickers(data, tickers):
+        tmp_path = None
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            # Each writer gets its own temp file; the rename swaps it in atomically
+            with tempfile.NamedTemporaryFile(dir=CACHE_DIR, suffix='.tmp', delete=False) as tmp:
+                tmp_path = Path(tmp.name)
+                data.to_parquet(tmp)
+            tmp_path.replace(path)
+        except Exception:
+            # Persistence is best-effort (read-only home, odd frame, no pyarrow):
+            # still serve the download
+            if tmp_path is not None:
+                tmp_path.unlink(missing_ok=True)
+    return data
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _download_prices(tickers, start, end):
+    """Price data cached on the ticker tuple and date range"""
+    # Copy so callers can't mutate the frame held by the in-process cache
+    return _cached_prices(tuple(tickers), str(start), str(end)).copy()
+
+def _decimate(series, target=1500):
+    """Stride a long series down to roughly `target` points for plotting,
+    keeping the last observation and the extremes"""
+    n = len(series)
+    if n <= target:
+        return series
+    step = -(-n // target)
+    values = series.to_numpy()
+    keep = np.unique(np.r_[np.arange(0, n, step), n - 1, values.argmin(), values.argmax()])
+    return series.iloc[keep]
+
 class PortfolioAnalytics:
     """Core portfolio analytics engine"""
     
-    def __init__(self, tickers, weights, start_date, end_date):
+    def __init__(self, tickers, weights, start_date, end_date, drawdown_lookback=None):
         self.tickers = tickers
-        self.weights = np.array(weights)
+        self.weights = weights
         self.start_date = start_date
         self.end_date = end_date
+        self.drawdown_lookback = drawdown_lookback
         self.data = None
         self.returns = None
+        self._R = None
+    
+    @property
+    def weights(self):
+        """Portfolio weights as a C-contiguous float64 array"""
+        return self._weights
+    
+    @weights.setter
+    def weights(self, weights):
+        # Coerce on every assignment; the kernels accept only contiguous float64
+        self._weights = np.ascontiguousarray(weights, dtype=np.float64)
+    
+    @property
+    def drawdown_lookback(self):
+        """Trailing window (trading days) for the drawdown peak; None uses full history"""
+        return self._drawdown_lookback
+    
+    @drawdown_lookback.setter
+    def drawdown_lookback(self, lookback):
+        if lookback is not None and (
+            isinstance(lookback, bool)
+            or not isinstance(lookback, (int, np.integer))
+            or lookback < 1
+        ):
+            raise ValueError(f"drawdown_lookback must be None or an int >= 1, got {lookback!r}")
+        self._drawdown_lookback = None if lookback is None else int(lookback)
+    
+    def _check_weights(self):
+        """Ensure one weight per returns column; the kernels don't bounds-check"""
+        if self._weights.shape != (self._R.shape[1],):
+            raise ValueError(
+                f"weights must have shape ({self._R.shape[1]},), got {self._weights.shape}"
+            )
         
-    @st.cache_data
-    def fetch_data(_self):
+    def fetch_data(self):
         """Fetch price data for portfolio securities"""
         try:
-            data = yf.download(_self.tickers, start=_self.start_date, end=_self.end_date)['Adj Close']
-            if len(_self.tickers) == 1:
-                data = data.to_frame(name=_self.tickers[0])
-            return data.dropna()
+            # Sorted key so reordering tickers in the sidebar still hits the cache
+            data = _download_prices(tuple(sorted(self.tickers)), self.start_date, self.end_date)
+            return data.reindex(columns=self.tickers).dropna()
         except Exception as e:
             st.error(f"Error fetching data: {str(e)}")
             return None
@@ -71,37 +203,55 @@ class PortfolioAnalytics:
     def calculate_returns(self):
         """Calculate daily returns for each security"""
         if self.data is not None:
-            return self.data.pct_change().dropna()
+            # Weights follow user input order; frames assigned directly get the
+            # same reindex-then-dropna that fetch_data applies
+            if list(self.data.columns) != list(self.tickers):
+                self.data = self.data.reindex(columns=self.tickers).dropna()
+            # NaN rows are gone by now, so a plain price ratio suffices
+            prices = np.ascontiguousarray(self.data.to_numpy(), dtype=np.float64)
+            # Computed once; the kernel and BLAS calls all read this buffer
+            self._R = prices[1:] / prices[:-1] - 1.0
+            self.returns = pd.DataFrame(self._R, index=self.data.index[1:], columns=self.data.columns)
+            return self.returns
         return None
     
     def portfolio_returns(self):
         """Calculate weighted portfolio returns"""
-        if self.returns is not None:
-            return (self.returns * self.weights).sum(axis=1)
+        if self._R is not None:
+            self._check_weights()
+            return self._R @ self.weights
         return None
     
     def calculate_metrics(self):
         """Calculate comprehensive portfolio metrics"""
-        portfolio_rets = self.portfolio_returns()
-        
-        if portfolio_rets is None or len(portfolio_rets) == 0:
+        if self._R is None or self._R.shape[0] == 0:
             return {}
         
+        self._check_weights()
+        pr, cum, dd, mean, variance, max_drawdown = metrics_kernel(self._R, self.weights)
+        
+        if self.drawdown_lookback:
+            running_max = rolling_max_deque(cum, self.drawdown_lookback)
+            dd = cum / running_max - 1.0
+            max_drawdown = dd.min()
+        
         # Basic metrics
-        total_return = (1 + portfolio_rets).prod() - 1
-        annualized_return = portfolio_rets.mean() * 252
-        annualized_vol = portfolio_rets.std() * np.sqrt(252)
+        total_return = cum[-1] - 1.0
+        annualized_return = mean * 252
+        annualized_vol = np.sqrt(variance * 252)
         sharpe_ratio = annualized_return / annualized_vol if annualized_vol > 0 else 0
         
-        # Risk metrics
-        var_95 = np.percentile(portfolio_rets, 5)
-        cvar_95 = portfolio_rets[portfolio_rets <= var_95].mean() if len(portfolio_rets[portfolio_rets <= var_95]) > 0 else var_95
+        # Risk metrics (partial sort: the k worst days sit left of index k)
+        k = min(max(1, int(0.05 * pr.size)), pr.size - 1)
+        part = np.partition(pr, k)
+        var_95 = part[k]
+        cvar_95 = part[:k].mean() if k > 0 else var_95
         
-        # Maximum drawdown
-        cumulative = (1 + portfolio_rets).cumprod()
-        running_max = cumulative.expanding().max()
-        drawdown = (cumulative - running_max) / running_max
-        max_drawdown = drawdown.min()
+        # Wrap back into pandas only for plotting
+        index = self.returns.index
+        portfolio_rets = pd.Series(pr, index=index)
+        cumulative = pd.Series(cum, index=index)
+        drawdown = pd.Series(dd, index=index)
         
         return {
             'Total Return': total_return,
@@ -116,18 +266,60 @@ class PortfolioAnalytics:
             'Drawdown Series': drawdown
         }
     
+    def batch_metrics(self, W):
+        """Calculate headline metrics for a (K, N) matrix of candidate weights,
+        one portfolio per row in ticker order"""
+        if self._R is None or self._R.shape[0] == 0:
+            return {}
+        
+        # The parallel batch kernel has no AOT build, so only pay its JIT cost when used
+        from kernels import metrics_batch
+        
+        W = np.ascontiguousarray(np.atleast_2d(W), dtype=np.float64)
+        # The kernel does no bounds checking, so a mismatched W would read garbage
+        if W.ndim != 2 or W.shape[1] != self._R.shape[1]:
+            raise ValueError(
+                f"W must have shape (K, {self._R.shape[1]}), got {W.shape}"
+            )
+        stats = metrics_batch(self._R, W, self.drawdown_lookback or 0)
+        
+        annualized_return = stats[:, 1] * 252
+        annualized_vol = np.sqrt(stats[:, 2] * 252)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sharpe_ratio = np.where(annualized_vol > 0, annualized_return / annualized_vol, 0.0)
+        
+        return {
+            'Total Return': stats[:, 0],
+            'Annualized Return': annualized_return,
+            'Annualized Volatility': annualized_vol,
+            'Sharpe Ratio': sharpe_ratio,
+            'VaR (95%)': stats[:, 3],
+            'CVaR (95%)': stats[:, 4],
+            'Maximum Drawdown': stats[:, 5]
+        }
+    
     def risk_attribution(self):
         """Calculate risk contribution by asset"""
-        if self.returns is None:
+        if self._R is None or self._R.shape[0] < 2:
             return None
         
-        cov_matrix = self.returns.cov() * 252
-        portfolio_variance = np.dot(self.weights.T, np.dot(cov_matrix, self.weights))
+        self._check_weights()
+        
+        # Annualized sample covariance straight from the centered buffer. For a
+        # handful of assets the centering and X^T X run on a float32 copy of the
+        # returns (one extra cast pass), which is ample for 0.1% reporting
+        n, n_assets = self._R.shape
+        R = self._R.astype(np.float32, copy=False) if n_assets <= 32 else self._R
+        centered = R - R.mean(axis=0)
+        cov_matrix = (centered.T @ centered).astype(np.float64, copy=False)
+        cov_matrix *= 252.0 / (n - 1)
+        
+        marginal_contrib = cov_matrix @ self.weights
+        portfolio_variance = self.weights @ marginal_contrib
         
         if portfolio_variance <= 0:
             return None
         
-        marginal_contrib = np.dot(cov_matrix, self.weights)
         risk_contrib = self.weights * marginal_contrib / portfolio_variance
         
         return pd.DataFrame({
@@ -137,6 +329,245 @@ class PortfolioAnalytics:
             'Risk Contribution %': risk_contrib / risk_contrib.sum() * 100
         })
 
+def _load_portfolio(tickers, start_date, end_date, drawdown_lookback):
+    """Fetch prices and compute returns; weights are filled in by the fragment"""
+    portfolio = PortfolioAnalytics(
+        tickers, np.full(len(tickers), 1.0 / len(tickers)), start_date, end_date,
+        drawdown_lookback=int(drawdown_lookback) or None
+    )
+    portfolio.data = portfolio.fetch_data()
+    
+    if portfolio.data is None:
+        st.error("Unable to fetch data. Please check your ticker symbols and try again.")
+        return None
+    
+    portfolio.returns = portfolio.calculate_returns()
+    
+    if portfolio.returns is None:
+        st.error("Unable to calculate returns.")
+        return None
+    
+    return portfolio
+
+@st.fragment
+def _render_analysis(portfolio):
+    """Weight inputs and analytics; reruns on its own when only weights change"""
+    tickers = portfolio.tickers
+    
+    # Portfolio weights
+    st.subheader("⚖️ Portfolio Weights")
+    
+    # Equal weights as default, edited in a single table widget
+    edited = st.data_editor(
+        pd.DataFrame({
+            'Ticker': tickers,
+            'Weight': np.full(len(tickers), 1.0 / len(tickers))
+        }),
+        hide_index=True,
+        num_rows='fixed',
+        disabled=['Ticker'],
+        column_config={
+            'Weight': st.column_config.NumberColumn(
+                min_value=0.0,
+                max_value=1.0,
+                step=0.01,
+                format='%.2f',
+                required=True
+            )
+        }
+    )
+    weights = edited['Weight'].fillna(0.0).to_numpy(dtype=np.float64, copy=True)
+    
+    # Normalize weights
+    total_weight = weights.sum()
+    if total_weight > 0:
+        weights /= total_weight
+    else:
+        st.error("Total weights must be greater than 0")
+        return
+    
+    portfolio.weights = weights
+    
+    # Calculate metrics
+    metrics = portfolio.calculate_metrics()
+    
+    if not metrics:
+        st.error("Unable to calculate portfolio metrics.")
+        return
+    
+    # Display results
+    st.success("✅ Analysis completed successfully!")
+    
+    # Portfolio composition
+    st.subheader("📊 Portfolio Composition")
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Pie chart
+        fig_pie = go.Figure(go.Pie(
+            labels=tickers,
+            values=weights,
+            textposition='inside',
+            textinfo='percent+label'
+        ))
+        fig_pie.update_layout(title="Portfolio Weights")
+        st.plotly_chart(fig_pie, use_container_width=True)
+    
+    with col2:
+        # Weights table
+        weights_df = pd.DataFrame({
+            'Ticker': tickers,
+            'Weight': [f"{w:.1%}" for w in weights]
+        })
+        st.dataframe(weights_df, use_container_width=True, hide_index=True)
+    
+    # Key metrics
+    st.subheader("📈 Key Performance Metrics")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric(
+            "Total Return", 
+            f"{metrics['Total Return']:.2%}",
+            help="Total portfolio return over the period"
+        )
+        st.metric(
+            "Sharpe Ratio", 
+            f"{metrics['Sharpe Ratio']:.3f}",
+            help="Risk-adjusted return measure"
+        )
+    
+    with col2:
+        st.metric(
+            "Annualized Return", 
+            f"{metrics['Annualized Return']:.2%}",
+            help="Annualized portfolio return"
+        )
+        st.metric(
+            "Max Drawdown", 
+            f"{metrics['Maximum Drawdown']:.2%}",
+            help="Maximum peak-to-trough decline"
+        )
+    
+    with col3:
+        st.metric(
+            "Volatility", 
+            f"{metrics['Annualized Volatility']:.2%}",
+            help="Annualized portfolio volatility"
+        )
+        st.metric(
+            "VaR (95%)", 
+            f"{metrics['VaR (95%)']:.2%}",
+            help="Value at Risk (95% confidence)"
+        )
+    
+    with col4:
+        st.metric(
+            "CVaR (95%)", 
+            f"{metrics['CVaR (95%)']:.2%}",
+            help="Conditional Value at Risk"
+        )
+    
+        # Calculate days analyzed
+        days_analyzed = len(portfolio.returns)
+        st.metric(
+            "Days Analyzed", 
+            f"{days_analyzed}",
+            help="Number of trading days in analysis"
+        )
+    
+    # Performance charts
+    st.subheader("📈 Performance Analysis")
+    
+    tab1, tab2, tab3 = st.tabs(["Cumulative Returns", "Drawdown Analysis", "Returns Distribution"])
+    
+    with tab1:
+        cumulative = _decimate(metrics['Cumulative Returns'])
+        fig_perf = go.Figure()
+        fig_perf.add_trace(go.Scatter(
+            x=cumulative.index,
+            y=cumulative.values,
+            mode='lines',
+            name='Portfolio',
+            line=dict(color='#1f77b4', width=2)
+        ))
+        fig_perf.update_layout(
+            title="Portfolio Cumulative Returns",
+            xaxis_title="Date",
+            yaxis_title="Cumulative Return",
+            hovermode='x unified'
+        )
+        st.plotly_chart(fig_perf, use_container_width=True)
+    
+    with tab2:
+        drawdown = _decimate(metrics['Drawdown Series'])
+        fig_dd = go.Figure()
+        fig_dd.add_trace(go.Scatter(
+            x=drawdown.index,
+            y=drawdown.values * 100,
+            mode='lines',
+            name='Drawdown',
+            fill='tonexty',
+            line=dict(color='red', width=1)
+        ))
+        fig_dd.update_layout(
+            title="Portfolio Drawdown",
+            xaxis_title="Date",
+            yaxis_title="Drawdown (%)",
+            hovermode='x unified'
+        )
+        st.plotly_chart(fig_dd, use_container_width=True)
+    
+    with tab3:
+        # Bin server-side so only the 50 counts are sent to the browser
+        returns_pct = metrics['Portfolio Returns'].to_numpy() * 100
+        counts, edges = np.histogram(returns_pct, bins=50)
+        fig_hist = go.Figure(go.Bar(
+            x=0.5 * (edges[:-1] + edges[1:]),
+            y=counts,
+            width=np.diff(edges)
+        ))
+        fig_hist.update_layout(
+            title="Daily Returns Distribution (%)",
+            xaxis_title="Daily Return (%)",
+            yaxis_title="Frequency",
+            bargap=0
+        )
+        st.plotly_chart(fig_hist, use_container_width=True)
+    
+    # Risk attribution
+    st.subheader("⚠️ Risk Attribution Analysis")
+    risk_attr = portfolio.risk_attribution()
+    
+    if risk_attr is not None:
+        col1, col2 = st.columns(2)
+    
+        with col1:
+            # Risk contribution chart
+            fig_risk = go.Figure(go.Bar(
+                x=risk_attr['Asset'].to_numpy(),
+                y=risk_attr['Risk Contribution %'].to_numpy()
+            ))
+            fig_risk.update_layout(
+                title="Risk Contribution by Asset",
+                xaxis_title="Asset",
+                yaxis_title="Risk Contribution %"
+            )
+            st.plotly_chart(fig_risk, use_container_width=True)
+    
+        with col2:
+            # Risk attribution table
+            st.dataframe(
+                risk_attr.style.format({
+                    'Weight': '{:.1%}',
+                    'Risk Contribution': '{:.4f}',
+                    'Risk Contribution %': '{:.1f}%'
+                }),
+                use_container_width=True,
+                hide_index=True
+            )
+
 def main():
     """Main Streamlit application"""
     
@@ -178,224 +609,35 @@ def main():
             max_value=datetime.now()
         )
     
-    # Portfolio weights
-    st.sidebar.subheader("Portfolio Weights")
-    weights = []
-    
-    # Equal weights as default
-    default_weight = 1.0 / len(tickers)
-    
-    for ticker in tickers:
-        weight = st.sidebar.number_input(
-            f"{ticker} Weight", 
-            min_value=0.0, 
-            max_value=1.0, 
-            value=default_weight,
-            step=0.01,
-            format="%.2f"
-        )
-        weights.append(weight)
-    
-    # Normalize weights
-    total_weight = sum(weights)
-    if total_weight > 0:
-        weights = [w / total_weight for w in weights]
-    else:
-        st.error("Total weights must be greater than 0")
-        return
-    
-    # Display normalized weights
-    st.sidebar.write("**Normalized Weights:**")
-    for ticker, weight in zip(tickers, weights):
-        st.sidebar.write(f"{ticker}: {weight:.1%}")
+    # Drawdown settings
+    st.sidebar.subheader("Risk Settings")
+    drawdown_lookback = st.sidebar.number_input(
+        "Drawdown Lookback (days)",
+        min_value=0,
+        value=0,
+        step=21,
+        help="Measure drawdowns against the peak of the trailing N trading days (0 = full history)"
+    )
     
-    # Analysis button
+    # Analysis button; the inputs it was clicked with are remembered so later
+    # reruns redraw that analysis instead of refetching on every sidebar edit
+    current_inputs = (tuple(tickers), start_date, end_date, int(drawdown_lookback))
     if st.sidebar.button("🔍 Analyze Portfolio", type="primary"):
+        st.session_state.analyzed_inputs = current_inputs
+    
+    analyzed_inputs = st.session_state.get('analyzed_inputs')
+    if analyzed_inputs is not None:
+        if analyzed_inputs != current_inputs:
+            st.info("Settings changed. Click Analyze Portfolio to refresh the analysis.")
+        
+        analyzed_tickers, analyzed_start, analyzed_end, analyzed_lookback = analyzed_inputs
+        with st.spinner("Fetching market data..."):
+            portfolio = _load_portfolio(
+                list(analyzed_tickers), analyzed_start, analyzed_end, analyzed_lookback
+            )
         
-        with st.spinner("Fetching market data and calculating analytics..."):
-            
-            # Initialize portfolio
-            portfolio = PortfolioAnalytics(tickers, weights, start_date, end_date)
-            portfolio.data = portfolio.fetch_data()
-            
-            if portfolio.data is None:
-                st.error("Unable to fetch data. Please check your ticker symbols and try again.")
-                return
-            
-            portfolio.returns = portfolio.calculate_returns()
-            
-            if portfolio.returns is None:
-                st.error("Unable to calculate returns.")
-                return
-            
-            # Calculate metrics
-            metrics = portfolio.calculate_metrics()
-            
-            if not metrics:
-                st.error("Unable to calculate portfolio metrics.")
-                return
-            
-            # Display results
-            st.success("✅ Analysis completed successfully!")
-            
-            # Portfolio composition
-            st.subheader("📊 Portfolio Composition")
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Pie chart
-                fig_pie = px.pie(
-                    values=weights, 
-                    names=tickers, 
-                    title="Portfolio Weights"
-                )
-                fig_pie.update_traces(textposition='inside', textinfo='percent+label')
-                st.plotly_chart(fig_pie, use_container_width=True)
-            
-            with col2:
-                # Weights table
-                weights_df = pd.DataFrame({
-                    'Ticker': tickers,
-                    'Weight': [f"{w:.1%}" for w in weights]
-                })
-                st.dataframe(weights_df, use_container_width=True, hide_index=True)
-            
-            # Key metrics
-            st.subheader("📈 Key Performance Metrics")
-            
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                st.metric(
-                    "Total Return", 
-                    f"{metrics['Total Return']:.2%}",
-                    help="Total portfolio return over the period"
-                )
-                st.metric(
-                    "Sharpe Ratio", 
-                    f"{metrics['Sharpe Ratio']:.3f}",
-                    help="Risk-adjusted return measure"
-                )
-            
-            with col2:
-                st.metric(
-                    "Annualized Return", 
-                    f"{metrics['Annualized Return']:.2%}",
-                    help="Annualized portfolio return"
-                )
-                st.metric(
-                    "Max Drawdown", 
-                    f"{metrics['Maximum Drawdown']:.2%}",
-                    help="Maximum peak-to-trough decline"
-                )
-            
-            with col3:
-                st.metric(
-                    "Volatility", 
-                    f"{metrics['Annualized Volatility']:.2%}",
-                    help="Annualized portfolio volatility"
-                )
-                st.metric(
-                    "VaR (95%)", 
-                    f"{metrics['VaR (95%)']:.2%}",
-                    help="Value at Risk (95% confidence)"
-                )
-            
-            with col4:
-                st.metric(
-                    "CVaR (95%)", 
-                    f"{metrics['CVaR (95%)']:.2%}",
-                    help="Conditional Value at Risk"
-                )
-                
-                # Calculate days analyzed
-                days_analyzed = len(portfolio.returns)
-                st.metric(
-                    "Days Analyzed", 
-                    f"{days_analyzed}",
-                    help="Number of trading days in analysis"
-                )
-            
-            # Performance charts
-            st.subheader("📈 Performance Analysis")
-            
-            tab1, tab2, tab3 = st.tabs(["Cumulative Returns", "Drawdown Analysis", "Returns Distribution"])
-            
-            with tab1:
-                fig_perf = go.Figure()
-                fig_perf.add_trace(go.Scatter(
-                    x=metrics['Cumulative Returns'].index,
-                    y=metrics['Cumulative Returns'].values,
-                    mode='lines',
-                    name='Portfolio',
-                    line=dict(color='#1f77b4', width=2)
-                ))
-                fig_perf.update_layout(
-                    title="Portfolio Cumulative Returns",
-                    xaxis_title="Date",
-                    yaxis_title="Cumulative Return",
-                    hovermode='x unified'
-                )
-                st.plotly_chart(fig_perf, use_container_width=True)
-            
-            with tab2:
-                fig_dd = go.Figure()
-                fig_dd.add_trace(go.Scatter(
-                    x=metrics['Drawdown Series'].index,
-                    y=metrics['Drawdown Series'].values * 100,
-                    mode='lines',
-                    name='Drawdown',
-                    fill='tonexty',
-                    line=dict(color='red', width=1)
-                ))
-                fig_dd.update_layout(
-                    title="Portfolio Drawdown",
-                    xaxis_title="Date",
-                    yaxis_title="Drawdown (%)",
-                    hovermode='x unified'
-                )
-                st.plotly_chart(fig_dd, use_container_width=True)
-            
-            with tab3:
-                fig_hist = px.histogram(
-                    x=metrics['Portfolio Returns'] * 100,
-                    nbins=50,
-                    title="Daily Returns Distribution (%)"
-                )
-                fig_hist.update_layout(
-                    xaxis_title="Daily Return (%)",
-                    yaxis_title="Frequency"
-                )
-                st.plotly_chart(fig_hist, use_container_width=True)
-            
-            # Risk attribution
-            st.subheader("⚠️ Risk Attribution Analysis")
-            risk_attr = portfolio.risk_attribution()
-            
-            if risk_attr is not None:
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    # Risk contribution chart
-                    fig_risk = px.bar(
-                        risk_attr,
-                        x='Asset',
-                        y='Risk Contribution %',
-                        title="Risk Contribution by Asset"
-                    )
-                    st.plotly_chart(fig_risk, use_container_width=True)
-                
-                with col2:
-                    # Risk attribution table
-                    st.dataframe(
-                        risk_attr.style.format({
-                            'Weight': '{:.1%}',
-                            'Risk Contribution': '{:.4f}',
-                            'Risk Contribution %': '{:.1f}%'
-                        }),
-                        use_container_width=True,
-                        hide_index=True
-                    )
+        if portfolio is not None:
+            _render_analysis(portfolio)
     
     # Footer
     st.markdown("---")
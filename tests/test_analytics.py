@@ -0,0 +1,81 @@
+"""Consistency checks for the portfolio analytics engine"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("numba")
+pytest.importorskip("streamlit")
+pytest.importorskip("yfinance")
+pytest.importorskip("plotly")
+
+from streamlit_app import PortfolioAnalytics
+
+TICKERS = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA']
+
+@pytest.fixture
+def portfolio():
+    rng = np.random.default_rng(0)
+    index = pd.date_range('2023-01-02', periods=300, freq='B')
+    prices = 100 * np.cumprod(1 + rng.normal(0.0004, 0.02, (300, len(TICKERS))), axis=0)
+    portfolio = PortfolioAnalytics(TICKERS, np.full(len(TICKERS), 0.2), None, None)
+    portfolio.data = pd.DataFrame(prices, index=index, columns=TICKERS)
+    portfolio.calculate_returns()
+    return portfolio
+
+@pytest.mark.parametrize("drawdown_lookback", [None, 63])
+def test_batch_metrics_match_calculate_metrics(portfolio, drawdown_lookback):
+    portfolio.drawdown_lookback = drawdown_lookback
+    W = np.random.default_rng(1).dirichlet(np.ones(len(TICKERS)), 4)
+    batch = portfolio.batch_metrics(W)
+    
+    for row, weights in enumerate(W):
+        portfolio.weights = np.ascontiguousarray(weights)
+        metrics = portfolio.calculate_metrics()
+        for key, values in batch.items():
+            assert values[row] == pytest.approx(metrics[key], rel=1e-9, abs=1e-12)
+
+def test_batch_metrics_rejects_mismatched_weights(portfolio):
+    with pytest.raises(ValueError):
+        portfolio.batch_metrics(np.full((2, 3), 1 / 3))
+
+def test_metrics_match_pandas_reference(portfolio):
+    metrics = portfolio.calculate_metrics()
+    pr = (portfolio.returns * portfolio.weights).sum(axis=1)
+    cumulative = (1 + pr).cumprod()
+    drawdown = cumulative / cumulative.cummax() - 1
+    
+    assert metrics['Total Return'] == pytest.approx((1 + pr).prod() - 1)
+    assert metrics['Annualized Volatility'] == pytest.approx(pr.std() * np.sqrt(252))
+    assert metrics['Maximum Drawdown'] == pytest.approx(drawdown.min())
+    np.testing.assert_allclose(metrics['Drawdown Series'], drawdown)
+
+def test_assigned_weights_are_coerced_and_checked(portfolio):
+    portfolio.weights = [0.2] * len(TICKERS)
+    assert portfolio.weights.dtype == np.float64
+    assert portfolio.calculate_metrics()
+    
+    portfolio.weights = [0.5, 0.5, 0.0]
+    with pytest.raises(ValueError):
+        portfolio.calculate_metrics()
+
+@pytest.mark.parametrize("drawdown_lookback", [0, -5, 2.5])
+def test_invalid_drawdown_lookback_is_rejected(drawdown_lookback):
+    with pytest.raises(ValueError):
+        PortfolioAnalytics(TICKERS, np.full(len(TICKERS), 0.2), None, None, drawdown_lookback)
+
+@pytest.mark.parametrize("n_days", [1, 7, 250])
+@pytest.mark.parametrize("window", [1, 2, 5, 63, 1000])
+def test_rolling_max_deque_matches_pandas(n_days, window):
+    from kernels import rolling_max_deque
+    
+    cum = np.cumprod(1 + np.random.default_rng(n_days).normal(0, 0.02, n_days))
+    expected = pd.Series(cum).rolling(window, min_periods=1).max().to_numpy()
+    np.testing.assert_array_equal(rolling_max_deque(cum, window), expected)
+
+def test_integer_weights_match_float_weights(portfolio):
+    portfolio.weights = [1, 0, 0, 0, 0]
+    from_ints = portfolio.calculate_metrics()
+    portfolio.weights = [1.0, 0.0, 0.0, 0.0, 0.0]
+    from_floats = portfolio.calculate_metrics()
+    assert from_ints['Annualized Return'] == from_floats['Annualized Return']